@@ -1,10 +1,16 @@
 from abc import ABC, abstractmethod
+from collections import defaultdict
 import math
 import cnf
 import copy
 from dpll import dpll
 import random
-from grouping import Grouping
+from grouping import Grouping, popcount
+
+# (row, column) offsets of the up to 8 neighbors of a cell
+NEIGHBOR_OFFSETS = ((-1, -1), (-1, 0), (-1, 1),
+                    (0, -1), (0, 1),
+                    (1, -1), (1, 0), (1, 1))
 
 
 class MinesweeperMove(ABC):
@@ -111,7 +117,7 @@ class NotSoGoodAgent(MinesweeperAgent):
     def next_move(self):
         """Executes the agent's not so good strategy."""
         if random.random() < 0.1 and len(self.unrevealed) > 0:
-            row, col = sorted(self.unrevealed)[0]
+            row, col = min(self.unrevealed)
             return Reveal(row, col)
         else:
             return RandomReveal()
@@ -123,68 +129,109 @@ class BetterAgent(MinesweeperAgent):
     It keeps track of the state of the board after each move,
     in order to decide what it should do next.
 
+    Internally, each cell is identified by the single int row * num_columns + column
+    (see cell_id and cell_rc), and sets of cells are int bitmasks with bit i set iff
+    cell i is in the set, so set algebra on them is plain int arithmetic.
+
     """
     def __init__(self, num_rows, num_columns, num_mines):
         super().__init__(num_rows, num_columns, num_mines)
-        self.revealed = set()
-        self.safe = set()
-        self.flagged = set()
-        self.groupings = []
+        self.revealed = 0
+        self.safe = 0
+        self.flagged = 0
+        self.safe_unrevealed = 0  # kept equal to self.safe & ~self.revealed
+        self.groupings = set()
+        # bitmask of the cells neighboring each cell, indexed by cell id
+        self.neighbor_masks = []
+        for row in range(num_rows):
+            for col in range(num_columns):
+                mask = 0
+                for dr, dc in NEIGHBOR_OFFSETS:
+                    if 0 <= row + dr < num_rows and 0 <= col + dc < num_columns:
+                        mask |= 1 << self.cell_id(row + dr, col + dc)
+                self.neighbor_masks.append(mask)
+
+    def cell_id(self, row, column):
+        """Returns the int id of the cell in the given row and column."""
+        return row * self.num_columns + column
+
+    def cell_rc(self, cell):
+        """Returns the (row, column) coordinates of the cell with the given int id."""
+        return divmod(cell, self.num_columns)
     
     def find_neighbors(self, row, column, num_mine_neighbors):
         """A helper method that finds and gathers information about a given cells neighboring cells."""
+        cell = self.cell_id(row, column)
         # mark cell safe in each grouping
-        for grouping in self.groupings: grouping.is_safe((row, column))
-
-        self.safe.add((row, column))
-        self.revealed.add((row, column))
-        new_set = set()
-
-        for r in range(row - 1, row + 2): # set row boundary
-            for c in range(column - 1, column + 2): # set col boundary
-                # check that neighboring cell exists
-                if (r, c) == (row, column) or r < 0 or c < 0 or r >= self.num_rows or c >= self.num_columns: continue
-                if (r, c) in self.flagged: num_mine_neighbors -= 1
-                elif (r, c) not in self.revealed: new_set.add((r, c))             
+        self.groupings = {grouping.is_safe(cell) for grouping in self.groupings}
+
+        self.safe |= 1 << cell
+        self.revealed |= 1 << cell
+        self.safe_unrevealed &= ~(1 << cell)
+
+        neighbors = self.neighbor_masks[cell]
+        num_mine_neighbors -= popcount(neighbors & self.flagged)
         # create new grouping with unrevealed and unflagged cells
-        self.groupings.append(Grouping(new_set, num_mine_neighbors))
+        self.groupings.add(Grouping(neighbors & ~self.flagged & ~self.revealed, num_mine_neighbors))
     
     def prune_groupings(self):
-        """A helper method that prunes the groupings based on information about the cells in the groups."""
-        
-        for grouping in self.groupings:
-            # remove empty groupings
-            if grouping.is_empty():
-                self.groupings.remove(grouping)
-                continue
-
-            # if the grouping is all bombs, flag all cells
-            elif grouping.all_mines() is not None:     
-                self.groupings.remove(grouping)
-                self.flagged.union(grouping.all_mines())
-                for bomb in grouping.all_mines().copy():
-                    for grouping in self.groupings: grouping.is_mine(bomb)
-                    self.flagged.add(bomb)
-                continue
-                    
-            # if the grouping is all safe, mark all as safe
-            elif grouping.all_safe() is not None:
-                self.groupings.remove(grouping)
-                self.safe.union(grouping.all_safe())
-                for s in grouping.all_safe().copy():
-                    for grouping in self.groupings: grouping.is_safe(s)
-                    self.safe.add(s)
-                continue
-            
-            for grouping2 in self.groupings:
-                # remove duplicate groupings
-                if grouping is not grouping2 and grouping == grouping2: self.groupings.remove(grouping2)
-                # create new grouping of unmarked cells
-                elif grouping is not grouping2 and all(el in grouping2.cells for el in grouping.cells):
-                    new_cells = grouping2.cells.difference(grouping.cells)
-                    new_num_mine_neighbors = grouping2.num_mine_neighbors - grouping.num_mine_neighbors
-                    new_sent = Grouping(new_cells, new_num_mine_neighbors)
-                    if new_sent not in self.groupings: self.groupings.append(new_sent)
+        """A helper method that prunes the groupings based on information about the cells in the groups.
+
+        Flagging or marking cells and deriving new groupings can each make other groupings
+        all mines or all safe, so the pruning steps are repeated until nothing changes.
+
+        """
+
+        changed = True
+        while changed:
+            mines, safe = 0, 0
+            remaining = set()
+            for grouping in self.groupings:
+                # drop empty groupings
+                if grouping.is_empty(): continue
+
+                # if the grouping is all bombs, flag all cells
+                grouping_mines = grouping.all_mines()
+                if grouping_mines is not None:
+                    mines |= grouping_mines
+                    continue
+
+                # if the grouping is all safe, mark all as safe
+                grouping_safe = grouping.all_safe()
+                if grouping_safe is not None:
+                    safe |= grouping_safe
+                    continue
+
+                remaining.add(grouping)
+
+            self.flagged |= mines
+            self.safe |= safe
+            self.safe_unrevealed |= safe & ~self.revealed
+            # groupings are immutable, so marking the cells rebuilds the set (which also drops duplicates)
+            if mines | safe:
+                remaining = {grouping.mark(mines, safe) for grouping in remaining}
+
+            # index the groupings by size, since a grouping can only be contained in larger ones
+            groupings_by_size = defaultdict(list)
+            for grouping in remaining:
+                groupings_by_size[popcount(grouping.cells)].append(grouping)
+            sizes = sorted(groupings_by_size)
+
+            # create new groupings of the unmarked cells left over when one grouping contains another
+            for i, size in enumerate(sizes):
+                if size == 0: continue
+                larger = [grouping2 for size2 in sizes[i + 1:] for grouping2 in groupings_by_size[size2]]
+                for grouping in groupings_by_size[size]:
+                    for grouping2 in larger:
+                        if grouping.cells & ~grouping2.cells: continue  # not a subset
+                        new_cells = grouping2.cells & ~grouping.cells
+                        new_num_mine_neighbors = grouping2.num_mine_neighbors - grouping.num_mine_neighbors
+                        new_sent = Grouping(new_cells, new_num_mine_neighbors)
+                        remaining.add(new_sent)
+
+            # stop once no cell was marked and no grouping was dropped or derived
+            changed = bool(mines | safe) or remaining != self.groupings
+            self.groupings = remaining
 
 
     def report(self, row, column, num_mine_neighbors):
@@ -199,9 +246,10 @@ class BetterAgent(MinesweeperAgent):
     def next_move(self):
         """Executes a random move from the list of safe moves that have not been executed."""
 
-        if self.safe - self.revealed:  # check that there is a safe move to make
+        if self.safe_unrevealed:  # check that there is a safe move to make
             # make a safe move
-            row, col = list(self.safe - self.revealed)[0]
+            # take the safe cell with the lowest id, i.e. the lowest set bit
+            row, col = self.cell_rc((self.safe_unrevealed & -self.safe_unrevealed).bit_length() - 1)
             return Reveal(row, col)
         
         # if there aren't any safe moves, hit the parachute button
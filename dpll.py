@@ -1,11 +1,29 @@
-import cnf
 from cnf import Clause, Literal, Cnf
 from util import SearchSpace, dfs
 from random import shuffle
 from search import SatisfiabilitySearchSpace
-from collections import defaultdict
+from collections import defaultdict, OrderedDict
+from functools import lru_cache
 
-def unit_resolve(unit_clauses, clause):
+def unit_literal_sets(unit_clauses):
+    """Collects the literals of a set of unit clauses, and their negations.
+
+    Parameters
+    ----------
+    unit_clauses : set[Clause]
+        The set of unit clauses.
+
+    Returns
+    -------
+    set[Literal], set[Literal]
+        The unit literals and their negations, respectively.
+    """
+    unit_lit_set = {uc.get_literals()[0] for uc in unit_clauses}
+    unit_neg_set = {lit.negate() for lit in unit_lit_set}
+    return unit_lit_set, unit_neg_set
+
+
+def unit_resolve(unit_clauses, clause, unit_lit_set=None, unit_neg_set=None):
     """Resolves a clause with a set of unit clauses.
 
     This function resolves the provided clause simultaneously with all
@@ -24,6 +42,12 @@ def unit_resolve(unit_clauses, clause):
         The set of unit clauses.
     clause : Clause
         The clause to resolve with the unit clauses.
+    unit_lit_set : set[Literal], optional
+        The literals of the unit clauses, as returned by unit_literal_sets.
+        Callers that resolve many clauses against the same unit clauses
+        should compute this once and pass it in.
+    unit_neg_set : set[Literal], optional
+        The negations of the unit clause literals, as returned by unit_literal_sets.
 
     See the examples in test.TestUnitResolve to gain further insight into
     the expected behavior of this function.
@@ -31,24 +55,21 @@ def unit_resolve(unit_clauses, clause):
     Returns
     -------
     Clause
-        The resolved clause (or None if the original clause is redundant)
+        The resolved clause (or None if the original clause is redundant). If no
+        literal is removed, this is the original clause object itself.
     """
+    if unit_lit_set is None or unit_neg_set is None:
+        unit_lit_set, unit_neg_set = unit_literal_sets(unit_clauses)
+
     # check for redundancy
     clause_literals = clause.get_literals()
-    for uc in unit_clauses:
-        lit = uc.get_literals()[0]
-        if lit in clause_literals: 
-            return None
+    if not unit_lit_set.isdisjoint(clause_literals):
+        return None
     
     # resolve each unit clause
-    new_literals = []
-    for literal in clause_literals:
-        add = True
-        for uc in unit_clauses:
-            lit = uc.get_literals()[0]
-            if lit.negate() == literal:
-                add = False
-        if add: new_literals.append(literal)
+    new_literals = [literal for literal in clause_literals if literal not in unit_neg_set]
+    if len(new_literals) == len(clause_literals):
+        return clause  # nothing to resolve, so reuse the clause
     
     return Clause(new_literals)
 
@@ -81,44 +102,503 @@ def unit_resolution(unit_clauses, regular_clauses):
     """
     unit_clauses = set(unit_clauses)
     regular_clauses = set(regular_clauses)
+    unit_lit_set, unit_neg_set = unit_literal_sets(unit_clauses)
     iter = True
     while iter:  # while there are still changes in the unit clauses
-        newRC = set()
         newUC = False
+        # the set of regular clauses is updated in place once the pass is over
+        to_remove, to_add = [], []
         for clause in regular_clauses:  # resolve each clause with each unit clause
-            new_clause = unit_resolve(unit_clauses, clause)
-            if new_clause is None: continue
+            new_clause = unit_resolve(unit_clauses, clause, unit_lit_set, unit_neg_set)
+            if new_clause is None: to_remove.append(clause)
             elif len(new_clause.get_literals()) == 1: 
                 newUC = True
                 unit_clauses.add(new_clause)
-            else: newRC.add(new_clause)
+                to_remove.append(clause)
+                # the new unit clause takes part in the rest of this pass
+                lit = new_clause.get_literals()[0]
+                unit_lit_set.add(lit)
+                unit_neg_set.add(lit.negate())
+            elif new_clause is not clause:
+                to_remove.append(clause)
+                to_add.append(new_clause)
         
-        regular_clauses = newRC
+        regular_clauses.difference_update(to_remove)
+        regular_clauses.update(to_add)
         iter = newUC
 
-    return set(unit_clauses), regular_clauses
+    return unit_clauses, regular_clauses
+
+
+def encode_clause(clause, sym_index):
+    """Encodes a clause as a pair of bitmasks over symbol indices.
+
+    Bit i of the first (second) mask is set iff the clause contains the positive
+    (negative) literal of the symbol with index i.
+
+    Parameters
+    ----------
+    clause : Clause
+        The clause to encode.
+    sym_index : dict[str, int]
+        The index of each symbol.
+
+    Returns
+    -------
+    int, int
+        The positive and negative literal masks, respectively.
+    """
+    pos = neg = 0
+    for literal in clause.get_literals():
+        if literal.get_polarity(): pos |= 1 << sym_index[literal.get_symbol()]
+        else: neg |= 1 << sym_index[literal.get_symbol()]
+    return pos, neg
+
+
+def mask_codes(pos, neg):
+    """Returns the int literal codes (2 * i, or 2 * i + 1 if negative) of a pair of literal masks."""
+    codes = []
+    for polarity_bit, mask in ((0, pos), (1, neg)):
+        while mask:
+            low = mask & -mask
+            codes.append(2 * (low.bit_length() - 1) + polarity_bit)
+            mask ^= low
+    return codes
+
+
+def unit_resolution_bits(unit_pos, unit_neg, clauses):
+    """A bitset version of unit_resolution.
+
+    Clauses are encoded as in encode_clause and the unit clauses are folded into a
+    single pair of masks, so redundancy checks and literal removal are a couple of
+    int operations per clause instead of loops over literals:
+    - a clause is redundant iff (pos & unit_pos) | (neg & unit_neg) is nonzero
+    - resolving removes literals with pos & ~unit_neg and neg & ~unit_pos
+    - a resolved clause is FALSE iff pos | neg is zero, and a unit clause iff
+      pos | neg has exactly one bit set, i.e. x & (x - 1) is zero for x = pos | neg
+
+    Tautologies (pos & neg nonzero) must not be passed in, since they would look
+    like unit clauses.
+
+    Parameters
+    ----------
+    unit_pos : int
+        The positive literals of the unit clauses.
+    unit_neg : int
+        The negative literals of the unit clauses.
+    clauses : list[tuple[int, int]]
+        The encoded non-unit clauses.
+
+    Returns
+    -------
+    int, int, list[tuple[int, int]]
+        The positive and negative unit literals, and the resolved non-unit clauses.
+        As soon as a clause resolves to FALSE (or two unit clauses contradict each
+        other), resolution stops and the only returned clause is (0, 0).
+    """
+    while True:  # while there are still changes in the unit clauses
+        if unit_pos & unit_neg: return unit_pos, unit_neg, [(0, 0)]
+        new_pos = new_neg = 0
+        remaining = []
+        for pos, neg in clauses:
+            if pos & unit_pos or neg & unit_neg: continue
+            pos &= ~unit_neg
+            neg &= ~unit_pos
+            lits = pos | neg
+            if not lits: return unit_pos, unit_neg, [(0, 0)]
+            elif not lits & (lits - 1):  # a single literal is left
+                new_pos |= pos
+                new_neg |= neg
+            else: remaining.append((pos, neg))
+        clauses = remaining
+        if not new_pos | new_neg: break
+        unit_pos |= new_pos
+        unit_neg |= new_neg
+    return unit_pos, unit_neg, clauses
+
+
+def resolve_sentence(sent, sym_index):
+    """Encodes the clauses of a sentence as bitmasks and resolves them with its unit clauses.
+
+    Tautologies are dropped, and the unit clauses become the initial unit literals
+    of unit_resolution_bits.
+
+    Parameters
+    ----------
+    sent : Cnf
+        The sentence.
+    sym_index : dict[str, int]
+        The index of each symbol of the sentence.
+
+    Returns
+    -------
+    int, int, list[tuple[int, int]]
+        The result of unit_resolution_bits: the positive and negative unit literals,
+        and the resolved non-unit clauses, or [(0, 0)] if the sentence is inconsistent.
+    """
+    unit_pos = unit_neg = 0
+    clauses = []
+    for clause in sent.clauses:
+        pos, neg = encode_clause(clause, sym_index)
+        lits = pos | neg
+        if pos & neg: continue  # tautologies are always satisfied
+        elif lits and not lits & (lits - 1):  # unit clauses have a single literal
+            unit_pos |= pos
+            unit_neg |= neg
+        else:
+            clauses.append((pos, neg))
+    return unit_resolution_bits(unit_pos, unit_neg, clauses)
+
 
 class DpllSearchSpace(SatisfiabilitySearchSpace):
-    """A search space for the DPLL algorithm."""
+    """A search space for the DPLL algorithm.
+
+    Whenever unit propagation hits a conflict, the search space learns a clause that
+    rules out the responsible decisions. A clause learned for a sentence is implied by
+    every sentence that contains its clauses, so learned clauses are kept in
+    learned_clauses (keyed by the sentence's clauses) and a new search space starts
+    with the clauses learned for every stored subset of its own clauses. This suits
+    the agent's knowledge base, which only grows between queries. Only sentences that
+    learned something are stored, and like the dpll cache, learned_clauses only
+    remembers the max_learned_sentences most recently used ones.
+
+    """
 
-    def __init__(self, sent):
+    learned_clauses = OrderedDict()
+    max_learned_sentences = 2048
+
+    def __init__(self, sent, resolved=None):
         """
         Parameters
         ----------
         sent : Cnf
             a CNF sentence for which we want to find a satisfying model
+        resolved : tuple[int, int, list[tuple[int, int]]], optional
+            the result of resolve_sentence for sent, if the caller already computed it
 
         """
 
         super().__init__(sent)
-        unit_clauses = set()
-        regular_clauses = set()
-        for clause in sent.clauses:
-            if len(clause) == 1:
-                unit_clauses.add(clause)
-            else:
-                regular_clauses.add(clause)
-        self.unit_clauses, self.regular_clauses = unit_resolution(unit_clauses, regular_clauses)
+        self.sym_index = {sym: i for i, sym in enumerate(self.signature)}
+        if resolved is None: resolved = resolve_sentence(sent, self.sym_index)
+        unit_pos, unit_neg, clauses = resolved
+        unit_codes = mask_codes(unit_pos, unit_neg)
+        regular_codes = [mask_codes(pos, neg) for pos, neg in clauses]
+        self.unit_clauses = set([Clause([self.decode(code)]) for code in unit_codes])
+        self.regular_clauses = set([Clause([self.decode(code) for code in codes]) for codes in regular_codes])
+
+        # Literals are encoded as ints: 2 * i for the i-th signature symbol and 2 * i + 1
+        # for its negation, so negating a literal is code ^ 1.
+        self.values = [None] * len(self.signature)  # the current assignment of each symbol
+        self.levels = [0] * len(self.signature)  # the decision level of each assigned symbol
+        self.reasons = [None] * len(self.signature)  # the clause that implied each assigned symbol
+        self.trail = []  # assigned literal codes, in assignment order
+        self.trail_lim = []  # trail length at the start of each decision level
+        self.decisions = []  # the state literals that opened each decision level
+        self.clause_lits = []  # literal codes of each watched clause, watches first
+        self.watches = [[] for _ in range(2 * len(self.signature))]  # clauses watching each literal
+        self.inconsistent = False
+        self.activity_inc = 1.0  # the amount a learned clause adds to its symbols' activity
+        self.key = frozenset(sent.clauses)
+
+        # For the pure literal rule: the number of true literals in each of the sentence's
+        # own clauses, and the number of occurrences of each literal in the clauses that
+        # have none. Both are kept up to date by assign and backtrack.
+        self.original_codes = [codes for codes in regular_codes if codes]
+        self.occurrences = [[] for _ in range(2 * len(self.signature))]  # original clauses containing each literal
+        self.num_true = [0] * len(self.original_codes)
+        self.unsat_occurrences = [0] * (2 * len(self.signature))
+        for ci, codes in enumerate(self.original_codes):
+            for code in codes:
+                self.occurrences[code].append(ci)
+                self.unsat_occurrences[code] += 1
+
+        for code in unit_codes:
+            self.add_unit(code)
+        for codes in regular_codes:
+            self.add_clause(codes)
+        for clause in self.stored_clauses() - self.regular_clauses:
+            self.add_clause([self.encode(literal) for literal in clause.get_literals()])
+        if not self.inconsistent and self.propagate(0) is not None:
+            self.inconsistent = True
+
+    def stored_clauses(self):
+        """Returns the stored clauses learned for subsets of the sentence's clauses.
+
+        Returns
+        -------
+        set[Clause]
+            The learned clauses, all of which are implied by the sentence
+        """
+        keys = [key for key in DpllSearchSpace.learned_clauses if key <= self.key]
+        clauses = set()
+        for key in keys:
+            DpllSearchSpace.learned_clauses.move_to_end(key)
+            clauses |= DpllSearchSpace.learned_clauses[key]
+        return clauses
+
+    def store_clause(self, clause):
+        """Stores a learned clause under the sentence's clauses, evicting the least recently used sentence if needed."""
+        if self.key in DpllSearchSpace.learned_clauses:
+            DpllSearchSpace.learned_clauses.move_to_end(self.key)
+        else:
+            DpllSearchSpace.learned_clauses[self.key] = set()
+            if len(DpllSearchSpace.learned_clauses) > DpllSearchSpace.max_learned_sentences:
+                DpllSearchSpace.learned_clauses.popitem(last=False)
+        DpllSearchSpace.learned_clauses[self.key].add(clause)
+
+    def encode(self, literal):
+        """Returns the int code of a literal."""
+        return 2 * self.sym_index[literal.get_symbol()] + (not literal.get_polarity())
+
+    def decode(self, code):
+        """Returns the literal with the given int code."""
+        return Literal(self.signature[code >> 1], not code & 1)
+
+    def lit_value(self, code):
+        """Returns whether the literal is true or false under the current assignment (None if unassigned)."""
+        value = self.values[code >> 1]
+        return None if value is None else value != bool(code & 1)
+
+    def assign(self, code, reason=None):
+        """Makes the literal true and records it on the trail, along with the clause that implied it."""
+        self.values[code >> 1] = not code & 1
+        self.levels[code >> 1] = len(self.trail_lim)
+        self.reasons[code >> 1] = reason
+        self.trail.append(code)
+        for ci in self.occurrences[code]:
+            self.num_true[ci] += 1
+            if self.num_true[ci] == 1:  # the clause just became satisfied
+                for lit in self.original_codes[ci]: self.unsat_occurrences[lit] -= 1
+
+    def add_unit(self, code):
+        """Assigns a unit literal at the root level, flagging a contradiction."""
+        value = self.lit_value(code)
+        if value is False: self.inconsistent = True
+        elif value is None: self.assign(code)
+
+    def add_clause(self, codes):
+        """Adds a clause to the watched clauses, watching its first two literals.
+
+        Returns
+        -------
+        int
+            The index of the watched clause, or None if the clause has fewer than two literals
+        """
+        codes = list(dict.fromkeys(codes))
+        if len(codes) == 0: self.inconsistent = True
+        elif len(codes) == 1: self.add_unit(codes[0])
+        else:
+            self.watches[codes[0]].append(len(self.clause_lits))
+            self.watches[codes[1]].append(len(self.clause_lits))
+            self.clause_lits.append(codes)
+            return len(self.clause_lits) - 1
+        return None
+
+    def propagate(self, qhead):
+        """Performs two-watched-literal unit propagation of the trail from position qhead.
+
+        Clauses are only visited when one of their two watched literals becomes false.
+        A visited clause either finds another non-false literal to watch, becomes
+        unit (its other watch is implied), or is falsified.
+
+        Parameters
+        ----------
+        qhead : int
+            The position of the first trail literal that has not been propagated yet
+
+        Returns
+        -------
+        int
+            The index of a falsified clause, or None if there is no conflict
+        """
+        while qhead < len(self.trail):
+            false_lit = self.trail[qhead] ^ 1
+            qhead += 1
+            watching = self.watches[false_lit]
+            i = 0
+            while i < len(watching):
+                ci = watching[i]
+                lits = self.clause_lits[ci]
+                if lits[0] == false_lit: lits[0], lits[1] = lits[1], lits[0]
+                first = self.lit_value(lits[0])
+                if first is True:  # the clause is already satisfied
+                    i += 1
+                    continue
+                # look for a new literal to watch instead of false_lit
+                for k in range(2, len(lits)):
+                    if self.lit_value(lits[k]) is not False:
+                        lits[1], lits[k] = lits[k], lits[1]
+                        self.watches[lits[1]].append(ci)
+                        watching[i] = watching[-1]
+                        watching.pop()
+                        break
+                else:
+                    if first is False: return ci
+                    self.assign(lits[0], ci)
+                    i += 1
+        return None
+
+    def analyze(self, conflict):
+        """Finds the decisions responsible for a conflict.
+
+        Starting from the falsified clause, the implication graph is traced back
+        through the reason of every implied literal until only decisions are left.
+
+        Parameters
+        ----------
+        conflict : int
+            The index of the falsified clause
+
+        Returns
+        -------
+        list[int]
+            The codes of the responsible decision literals, deepest decision first
+        """
+        seen = set()
+        stack = list(self.clause_lits[conflict])
+        decisions = []
+        while stack:
+            var = stack.pop() >> 1
+            if var in seen: continue
+            seen.add(var)
+            if self.reasons[var] is not None: stack.extend(self.clause_lits[self.reasons[var]])
+            elif self.levels[var] > 0: decisions.append(2 * var + (not self.values[var]))
+        return sorted(decisions, key=lambda code: self.levels[code >> 1], reverse=True)
+
+    def learn(self, conflict):
+        """Learns from a conflict, then backjumps to the level where the learned clause is unit.
+
+        The learned clause is the disjunction of the negated responsible decisions.
+        Its deepest literal is asserted after backjumping, which can trigger further
+        conflicts at lower levels; a conflict without decisions means the sentence
+        itself is unsatisfiable.
+
+        Parameters
+        ----------
+        conflict : int
+            The index of the falsified clause
+        """
+        while conflict is not None:
+            codes = [code ^ 1 for code in self.analyze(conflict)]
+            if len(codes) == 0:
+                self.inconsistent = True
+                return
+            self.bump_activity(codes)
+            self.store_clause(Clause([self.decode(code) for code in codes]))
+            self.backtrack(self.levels[codes[1] >> 1] if len(codes) > 1 else 0)
+            ci = self.add_clause(codes)
+            if ci is not None: self.assign(codes[0], ci)
+            conflict = self.propagate(len(self.trail) - 1)
+
+    def pure_polarity(self, var):
+        """Checks whether a symbol is pure in the clauses that are not yet satisfied.
+
+        This is a constant-time lookup in the occurrence counts that assign and
+        backtrack maintain. Only the sentence's own clauses are counted: learned
+        clauses are entailed by them, so they cannot make a pure assignment
+        unsatisfiable.
+
+        Parameters
+        ----------
+        var : int
+            The index of the symbol in the signature
+
+        Returns
+        -------
+        bool
+            The only polarity with which the symbol occurs (False if it does not occur
+            at all), or None if it occurs with both polarities
+        """
+        positive, negative = self.unsat_occurrences[2 * var], self.unsat_occurrences[2 * var + 1]
+        if positive and negative: return None
+        return bool(positive)
+
+    def bump_activity(self, codes):
+        """Bumps the activity of the symbols of a learned clause (VSIDS).
+
+        Rather than decaying every activity after each conflict, the bump increment grows
+        by 1 / 0.95, which keeps the same relative order. Activities and the increment are
+        only rescaled if the increment gets too large for a float.
+        """
+        for code in codes: self.activity[self.signature[code >> 1]] += self.activity_inc
+        self.activity_inc /= 0.95
+        if self.activity_inc > 1e100:
+            for symbol in self.signature: self.activity[symbol] *= 1e-100
+            self.activity_inc *= 1e-100
+
+    def choose_symbol(self, state):
+        """Chooses the symbol that the successors of a (decided) state should assign.
+
+        Symbols implied by unit propagation come first, in the order they were implied.
+        Otherwise the unassigned symbol with the highest activity is chosen.
+
+        Parameters
+        ----------
+        state : tuple[Literal]
+            The literals assigned by the search node
+
+        Returns
+        -------
+        int
+            The index of the chosen symbol in the signature
+        """
+        state_vars = set(self.sym_index[literal.get_symbol()] for literal in state)
+        for code in self.trail:
+            if code >> 1 not in state_vars: return code >> 1
+        return max((var for var in range(len(self.signature)) if self.values[var] is None),
+                   key=lambda var: self.activity[self.signature[var]])
+
+    def backtrack(self, level):
+        """Undoes every assignment made after the given number of decision levels."""
+        if level < len(self.trail_lim):
+            for code in self.trail[self.trail_lim[level]:]:
+                self.values[code >> 1] = None
+                for ci in self.occurrences[code]:
+                    self.num_true[ci] -= 1
+                    if self.num_true[ci] == 0:  # the clause is no longer satisfied
+                        for lit in self.original_codes[ci]: self.unsat_occurrences[lit] += 1
+            del self.trail[self.trail_lim[level]:]
+            del self.trail_lim[level:]
+            del self.decisions[level:]
+
+    def decide(self, state):
+        """Brings the trail in line with the literals of a search state.
+
+        Only the literals that are not shared with the previously decided state are
+        (re)assigned and propagated, so expanding a child of the last expanded node
+        costs a single propagation step.
+
+        Parameters
+        ----------
+        state : tuple[Literal]
+            The literals assigned by the search node
+
+        Returns
+        -------
+        bool
+            False iff the state conjoined with the sentence entails False (according
+            to unit propagation)
+        """
+        level = 0
+        while level < min(len(state), len(self.decisions)) and state[level] == self.decisions[level]:
+            level += 1
+        self.backtrack(level)
+        for literal in state[level:]:
+            self.trail_lim.append(len(self.trail))
+            self.decisions.append(literal)
+            code = self.encode(literal)
+            value = self.lit_value(code)
+            if value is False:
+                self.backtrack(len(self.decisions) - 1)
+                return False
+            if value is None:
+                self.assign(code)
+                conflict = self.propagate(len(self.trail) - 1)
+                if conflict is not None:
+                    self.learn(conflict)
+                    return False
+        return True
 
     def get_successors(self, state):
         """Computes the successors of a DPLL search state.
@@ -126,8 +606,10 @@ class DpllSearchSpace(SatisfiabilitySearchSpace):
         A search state is a tuple of literals, one for each symbol in the signature.
         As with the SatisfiabilitySearchSpace, the successors of state
         (l_1, ..., l_k) should typically be (l_1, ..., l_k, !s_{k+1}) and
-        (l_1, ..., l_k, s_{k+1}), where s_{k+1} is the (k+1)th symbol in the
-        signature (according to an alphabetical ordering of the signature symbols).
+        (l_1, ..., l_k, s_{k+1}), where s_{k+1} is the next symbol to branch on.
+        A symbol already implied by unit propagation is chosen first; otherwise
+        s_{k+1} is the unassigned symbol with the highest VSIDS activity (see
+        bump_activity), ties going to the alphabetically first symbol.
 
         However:
         - if self.sent conjoined with literals l_1, ..., l_k entails False (according
@@ -139,6 +621,10 @@ class DpllSearchSpace(SatisfiabilitySearchSpace):
         - if self.sent conjoined with literals l_1, ..., l_k entails s_{k+1},
           (according to unit resolution), then the only successor should be
           (l_1, ..., l_k, s_{k+1}).
+        - if s_{k+1} is pure, i.e. it occurs with only one polarity in the clauses
+          that l_1, ..., l_k do not satisfy, then the only successor assigns it that
+          polarity (the pure literal rule). A symbol that does not occur in any of
+          these clauses is assigned False.
 
         See the examples in test.TestDpllSearchSpace to gain further insight into
         the expected behavior of this method.
@@ -148,6 +634,12 @@ class DpllSearchSpace(SatisfiabilitySearchSpace):
         - When you generate both successors (i.e. for both !s_{k+1} and s_{k+1}),
           put the !s_{k+1} successor first in the returned list.
 
+        Rather than re-running unit_resolution over the whole sentence for every
+        node, the search space keeps a trail of assignments and only propagates the
+        literals of state that differ from the previously expanded node, using
+        two watched literals per clause (see propagate). Propagation also uses the
+        clauses learned from earlier conflicts (see learn).
+
         Parameters
         ----------
         state : tuple[Literal]
@@ -159,19 +651,15 @@ class DpllSearchSpace(SatisfiabilitySearchSpace):
             The successor states.
         """
 
-        unit_clauses, regular_clauses = unit_resolution(self.unit_clauses | set([Clause([literal]) for literal in state]), self.regular_clauses)
-
         ret = []
-        if (cnf.c("FALSE")) in regular_clauses: return ret
-        
-        succ = self.signature[len(state)]
-        next = None 
-
-        for clause in unit_clauses:
-            if succ == clause.get_literals()[0].get_symbol():
-                next = clause.get_literals()[0]
-                break
-        if next is not None: ret.append(state + tuple([next]))
+        if self.inconsistent or not self.decide(state): return ret
+        if len(state) == len(self.signature): return ret
+
+        var = self.choose_symbol(state)
+        succ = self.signature[var]
+        next = self.values[var]
+        if next is None: next = self.pure_polarity(var)
+        if next is not None: ret.append(state + tuple([Literal(succ, next)]))
         else:
             ret.append(state + tuple([Literal(succ, False)]))
             ret.append(state + tuple([Literal(succ)]))
@@ -194,8 +682,32 @@ def dpll(sent):
         a satisfying model (if one exists), otherwise None is returned
     """
 
-    search_space = DpllSearchSpace(sent)
-    state, _ = dfs(search_space)
+    model = _cached_dpll(frozenset(sent.get_clauses()))
+    return dict(model) if model is not None else None
+
+
+@lru_cache(maxsize=2048)
+def _cached_dpll(clauses):
+    """Memoized implementation of dpll, keyed by the sentence's frozenset of clauses.
+
+    Repeated queries of the same sentence skip the search entirely. Callers must
+    copy the returned model before handing it out.
+
+    Sentences that unit resolution alone decides are answered before a
+    DpllSearchSpace is built: deriving FALSE means there is no model, and resolving
+    away every non-unit clause means the unit literals, with every other symbol set
+    to False, form a model. Otherwise the resolved clauses are handed to the search
+    space, so they are not resolved twice.
+
+    """
+    sent = Cnf(clauses)
+    signature = sorted(sent.get_symbols())
+    resolved = resolve_sentence(sent, {sym: i for i, sym in enumerate(signature)})
+    unit_pos, _, regular = resolved
+    if regular == [(0, 0)]: return None
+    if not regular: return {sym: bool(unit_pos >> i & 1) for i, sym in enumerate(signature)}
+
+    state, _ = dfs(DpllSearchSpace(sent, resolved))
     model = {lit.get_symbol(): lit.get_polarity() for lit in state} if state is not None else None
     return model
 
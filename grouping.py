@@ -1,28 +1,58 @@
+if hasattr(int, "bit_count"):
+    popcount = int.bit_count
+else:  # int.bit_count needs Python 3.10
+    def popcount(cells):
+        """Returns the number of cells in a cell bitmask."""
+        return bin(cells).count("1")
+
+
 class Grouping():
-    """A class that contains methods for gathering information for a group of Minesweeper cells."""
+    """A class that contains methods for gathering information for a group of Minesweeper cells.
+
+    The cells are stored as an int bitmask, with bit i set iff the cell with id i
+    belongs to the grouping.
+
+    Groupings are immutable, so they can be hashed and stored in sets. Methods that
+    update the grouping's information return a new grouping instead.
+
+    """
+    __slots__ = ('cells', 'num_mine_neighbors', '_hash')
+
     def __init__(self, cells, num_mine_neighbors):
-        self.cells = set(cells)
+        self.cells = cells
         self.num_mine_neighbors = num_mine_neighbors
+        self._hash = hash((self.cells, self.num_mine_neighbors))
     
     def __eq__(self, sentence2):
         return self.cells == sentence2.cells and self.num_mine_neighbors == sentence2.num_mine_neighbors
+
+    def __hash__(self):
+        return self._hash
     
     def is_mine(self, cell):
-        """Updates grouping information if given cell is a mine."""
-        if cell in self.cells:
-            self.cells.remove(cell)
-            self.num_mine_neighbors -= 1
+        """Returns the grouping that results from the given cell being a mine."""
+        if self.cells >> cell & 1:
+            return Grouping(self.cells & ~(1 << cell), self.num_mine_neighbors - 1)
+        return self
     
     def is_safe(self, cell):
-        """Removes safe cells from the group."""
-        if cell in self.cells: self.cells.remove(cell)
+        """Returns the grouping that results from removing a safe cell from the group."""
+        if self.cells >> cell & 1:
+            return Grouping(self.cells & ~(1 << cell), self.num_mine_neighbors)
+        return self
+    
+    def mark(self, mines, safe):
+        """Returns the grouping that results from the cells of the given bitmasks being mines and safe, respectively."""
+        if self.cells & (mines | safe):
+            return Grouping(self.cells & ~(mines | safe), self.num_mine_neighbors - popcount(self.cells & mines))
+        return self
     
     def all_mines(self):
         """Returns the cells of the grouping if they are all mines.
         Otherwise returns None.
 
         """
-        return self.cells if self.num_mine_neighbors == len(self.cells) else None 
+        return self.cells if self.num_mine_neighbors == popcount(self.cells) else None 
     
     def all_safe(self):
         """Returns the cells of the grouping if they are all safe."""
@@ -30,6 +60,6 @@ class Grouping():
     
     def is_empty(self):
         """Returns whether the grouping is empty."""
-        return len(self.cells) == 0
+        return self.cells == 0
     
    
\ No newline at end of file
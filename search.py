@@ -17,6 +17,10 @@ class SatisfiabilitySearchSpace(SearchSpace):
         self.sent = sent
         self.signature = sorted(sent.get_symbols())
         self.start_state = tuple()
+        # static branching order: symbols occurring in more clauses are branched on first
+        self.activity = {symbol: 0.0 for symbol in self.signature}
+        for clause in sent.get_clauses():
+            for symbol in clause.get_symbols(): self.activity[symbol] += 1.0
 
     def get_start_state(self):
         """Returns the start state.
@@ -49,6 +53,9 @@ class SatisfiabilitySearchSpace(SearchSpace):
     def get_successors(self, state):
         """Determines the possible successors of a state.
 
+        The next symbol is the unused one that occurs in the most clauses (ties go to the
+        alphabetically first one). This order is fixed when the search space is built.
+
         Parameters
         ----------
         state : tuple[str]
@@ -61,16 +68,10 @@ class SatisfiabilitySearchSpace(SearchSpace):
         """     
         # if all symbols are used, no successors exist
         if len(state) == len(self.signature): return tuple()
-        next_symbol = None
-        state_symbols = [i.get_symbol() for i in state]
-        # if there are no symbols used, generate successors including the first symbol
-        if len(state) == 0: 
-            next_symbol = self.signature[0]
-        else:  # get first unused symbol
-            for symbol in self.signature:
-                if symbol not in state_symbols:
-                    next_symbol = symbol
-                    break
+        state_symbols = set(i.get_symbol() for i in state)
+        # branch on the unused symbol occurring in the most clauses
+        next_symbol = max((symbol for symbol in self.signature if symbol not in state_symbols),
+                          key=self.activity.get)
         ret = [state + (Literal(next_symbol),), state + (Literal(next_symbol,False),)]
         
         return ret
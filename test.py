@@ -1,5 +1,10 @@
 import unittest
+import random
+from itertools import product
 from game import NoGraphicsGame
+from agent import BetterAgent, Reveal
+from cnf import l, sentence
+from dpll import DpllSearchSpace, dpll, _cached_dpll, unit_resolution_bits
 
 class TestOne(unittest.TestCase):
 
@@ -40,3 +45,111 @@ class TestFour(unittest.TestCase):
             print(f"Played fifty 9x9 games (10 mines) with average score of {result:.2f}.")
         except Exception as e:
             print(f"Game crashed! It triggered the following exception:\n{e}")
+
+class TestBetterAgent(unittest.TestCase):
+
+    def cells(self, agent, *cells):
+        mask = 0
+        for row, col in cells: mask |= 1 << agent.cell_id(row, col)
+        return mask
+
+    def assert_reveal(self, move, row, col):
+        self.assertIsInstance(move, Reveal)
+        self.assertEqual((move.row, move.column), (row, col))
+
+    def test_marked_mines_free_safe_cells(self):
+        # mines at (1, 0) and (1, 1): revealing (0, 1) makes both of them mines, and
+        # marking them leaves (0, 2) and (1, 2) without mines in the same report
+        agent = BetterAgent(2, 3, 2)
+        agent.report(0, 0, 2)
+        agent.report(0, 1, 2)
+        self.assertEqual(agent.flagged, self.cells(agent, (1, 0), (1, 1)))
+        self.assertEqual(agent.safe_unrevealed, self.cells(agent, (0, 2), (1, 2)))
+        self.assert_reveal(agent.next_move(), 0, 2)
+
+    def test_derived_grouping_frees_safe_cells(self):
+        # one mine in (1, 0) or (1, 1): the grouping of (0, 1) contains the one of (0, 0),
+        # and the derived grouping of the cells left over has no mines
+        agent = BetterAgent(2, 3, 1)
+        agent.report(0, 0, 1)
+        agent.report(0, 1, 1)
+        self.assertEqual(agent.flagged, 0)
+        self.assertEqual(agent.safe_unrevealed, self.cells(agent, (0, 2), (1, 2)))
+        self.assert_reveal(agent.next_move(), 0, 2)
+
+class TestUnitResolutionBits(unittest.TestCase):
+
+    def test_false_clause(self):
+        # resolving !a with the unit clause a gives FALSE
+        self.assertEqual(unit_resolution_bits(0b1, 0, [(0, 0b1)])[2], [(0, 0)])
+
+    def test_contradictory_units(self):
+        self.assertEqual(unit_resolution_bits(0b1, 0b1, [(0b110, 0)])[2], [(0, 0)])
+
+    def test_new_unit(self):
+        # resolving !a || !b with the unit clause a gives the unit clause !b
+        self.assertEqual(unit_resolution_bits(0b1, 0, [(0, 0b11)]), (0b1, 0b10, []))
+
+    def test_chained_units(self):
+        # a gives b through !a || b, then b gives c through !b || c
+        self.assertEqual(unit_resolution_bits(0b1, 0, [(0b100, 0b10), (0b10, 0b1)]), (0b111, 0, []))
+
+    def test_redundant_clause(self):
+        self.assertEqual(unit_resolution_bits(0b1, 0, [(0b11, 0b100)]), (0b1, 0, []))
+
+class TestDpllSearchSpace(unittest.TestCase):
+
+    def setUp(self):
+        DpllSearchSpace.learned_clauses.clear()
+        _cached_dpll.cache_clear()
+
+    def successors(self, sent, state):
+        return [tuple(str(lit) for lit in succ) for succ in DpllSearchSpace(sent).get_successors(state)]
+
+    def test_unit_clause(self):
+        self.assertEqual(self.successors(sentence("!a || b", "a"), ()), [("a",)])
+
+    def test_implied_symbol(self):
+        self.assertEqual(self.successors(sentence("!a || b", "a"), (l("a"),)), [("a", "b")])
+
+    def test_conflict(self):
+        self.assertEqual(self.successors(sentence("!a || b", "!a || !b"), (l("a"),)), [])
+
+    def test_pure_literal(self):
+        # b occurs with both polarities, but a only positively
+        self.assertEqual(self.successors(sentence("a || b", "a || !b"), ()), [("a",)])
+
+    def test_both_branches(self):
+        self.assertEqual(self.successors(sentence("a || b", "!a || !b"), ()), [("!a",), ("a",)])
+
+    def test_learned_clauses_reused(self):
+        # three pigeons do not fit in two holes, which takes conflicts to show
+        clauses = ["p00 || p01", "p10 || p11", "p20 || p21",
+                   "!p00 || !p10", "!p00 || !p20", "!p10 || !p20",
+                   "!p01 || !p11", "!p01 || !p21", "!p11 || !p21"]
+        sent = sentence(*clauses)
+        larger = sentence(*clauses, "p00 || q")
+        self.assertFalse(DpllSearchSpace(larger).inconsistent)
+        self.assertIsNone(dpll(sent))
+        self.assertEqual(list(DpllSearchSpace.learned_clauses), [frozenset(sent.clauses)])
+        # what was learned for sent also holds for a sentence containing its clauses
+        self.assertTrue(DpllSearchSpace(larger).inconsistent)
+        self.assertEqual(self.successors(larger, ()), [])
+
+class TestDpll(unittest.TestCase):
+
+    def test_against_brute_force(self):
+        rng = random.Random(0)
+        symbols = ["a", "b", "c", "d", "e", "f"]
+        for _ in range(300):
+            clauses = []
+            for _ in range(rng.randint(1, 25)):
+                clause = rng.sample(symbols, rng.randint(1, 3))
+                clauses.append(" || ".join(("!" if rng.random() < 0.5 else "") + sym for sym in clause))
+            sent = sentence(*clauses)
+            sent_symbols = sorted(sent.get_symbols())
+            satisfiable = any(sent.check_model(dict(zip(sent_symbols, values)))
+                              for values in product([False, True], repeat=len(sent_symbols)))
+            model = dpll(sent)
+            self.assertEqual(model is not None, satisfiable, clauses)
+            if model is not None: self.assertTrue(sent.check_model(model), clauses)